@@ -1,12 +1,19 @@
 """Агент для парсинга страниц и выполнения различных задач."""
 
+import asyncio
+import hashlib
 import logging
 import os
+import re
+from functools import lru_cache
 from typing import Dict, List
 
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from requests_cache import CachedSession
+from selectolax.lexbor import LexborHTMLParser
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -14,79 +21,423 @@ from tenacity import (
     retry_if_exception_type,
 )
 
-from openai_module import OpenAIClient
+from cache import LLMCache, LRUCache, SemanticCache
+from openai_module import OpenAIClient, get_default_client, is_fallback_result
 
-# Загружаем переменные окружения
-load_dotenv()
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
+# Любая последовательность пробельных символов
+_WS_RE = re.compile(r"\s+")
 
-class PageParser:
-    """Класс для парсинга веб-страниц."""
+# Сколько байт страницы скачивать: для анализа достаточно начала документа
+_MAX_HTML_BYTES = 512 * 1024
 
-    @staticmethod
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((requests.RequestException,)),
+# Элементы <body>, содержимое которых не является текстом страницы.
+# meta и link — пустые элементы без текста, искать их не нужно.
+_SKIP_SELECTOR = "script, style, noscript"
+
+# Типы содержимого, которые имеет смысл разбирать как HTML
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml")
+
+# Объявление кодировки в <meta> в начале документа
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+# Заголовки HTTP-запросов за страницами, задаются клиентам один раз при импорте
+_DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+def _is_html_type(content_type: str) -> bool:
+    """Проверяет, что Content-Type ответа допускает HTML (пустой тоже допускает)."""
+    return not content_type or content_type.lower().startswith(_HTML_CONTENT_TYPES)
+
+
+def _read_capped_body(response: requests.Response, *args, **kwargs) -> None:
+    """
+    Читает не больше _MAX_HTML_BYTES тела HTML-ответа и закрывает соединение.
+
+    Хук вызывается requests до того, как requests-cache сохранит ответ, поэтому
+    в кэш попадает уже обрезанное тело, а остаток страницы не скачивается —
+    в том числе при chunked-ответах и сжатии (лимит считается по распакованным
+    байтам). Тело ответов другого типа не читается вовсе.
+
+    Args:
+        response: Ответ сервера до чтения тела
+    """
+    if not _is_html_type(response.headers.get("content-type", "")):
+        return
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=65536):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= _MAX_HTML_BYTES:
+            break
+    # Закрываем соединение до того, как пометить тело прочитанным: иначе
+    # requests вернёт его в пул вместе с недочитанным остатком
+    response.close()
+    # requests не умеет читать тело частично, поэтому прочитанное начало
+    # сохраняется как содержимое ответа
+    response._content = b"".join(chunks)[:_MAX_HTML_BYTES]
+    response._content_consumed = True
+
+
+def _is_cacheable(response: requests.Response) -> bool:
+    """
+    Решает, сохранять ли ответ в кэш страниц.
+
+    Сохраняются только HTML-ответы: тело остальных не читается
+    (см. _read_capped_body), и _check_content_type() отклоняет их.
+
+    Args:
+        response: Ответ сервера
+
+    Returns:
+        True, если ответ можно сохранить в кэш
+    """
+    return _is_html_type(response.headers.get("content-type", ""))
+
+
+# Асинхронные HTTP-клиенты для пакетной обработки множества URL, по одному
+# на event loop: соединения httpx привязаны к loop, в котором открыты
+_ASYNC_CLIENTS: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+# Кэш извлечённого текста по хэшу HTML: одна и та же страница не разбирается дважды
+_TEXT_CACHE = LRUCache(maxsize=128)
+
+# Текст страниц по URL: страница загружается не больше одного раза за процесс
+_PAGE_TEXT_CACHE = LRUCache(maxsize=64)
+
+
+@lru_cache(maxsize=1)
+def _get_llm_cache() -> LLMCache:
+    """
+    Возвращает кэш ответов модели, создавая его при первом обращении.
+
+    Одинаковый текст с теми же параметрами не отправляется в модель повторно.
+    Кэш создаётся лениво, чтобы настройки из .env уже были загружены.
+
+    Returns:
+        Экземпляр LLMCache
+    """
+    # Семантический кэш включается списком задач через запятую в
+    # LLM_SEMANTIC_CACHE (например, "classify,ux_report"); вопросы генерируются
+    # с высокой температурой, поэтому кэшировать их по похожести стоит только
+    # осознанно
+    tasks = [
+        task.strip()
+        for task in os.getenv("LLM_SEMANTIC_CACHE", "").split(",")
+        if task.strip()
+    ]
+    # Заглушки вместо ответа модели не кэшируются, чтобы одна неудачная генерация
+    # не закрепилась за страницей на сутки
+    semantic = SemanticCache(tasks, skip_if=is_fallback_result) if tasks else None
+    return LLMCache(semantic=semantic, skip_if=is_fallback_result)
+
+
+@lru_cache(maxsize=1)
+def _get_session() -> CachedSession:
+    """
+    Возвращает общую HTTP-сессию, создавая её при первом обращении.
+
+    Сессия держит keep-alive и пул соединений между запросами. Ответы
+    кэшируются на диске с учётом Cache-Control/ETag/Last-Modified, поэтому
+    повторная загрузка той же страницы обходится без скачивания. Сессия
+    создаётся лениво, чтобы импорт модуля не создавал файл кэша.
+
+    Returns:
+        Экземпляр CachedSession
+    """
+    session = CachedSession(
+        cache_name=".http_cache",
+        backend="sqlite",
+        expire_after=3600,
+        cache_control=True,
+        filter_fn=_is_cacheable,
     )
-    def fetch_html(url: str) -> str:
-        """
-        Загружает HTML-контент по URL.
+    session.headers.update(_DEFAULT_HEADERS)
+    session.hooks["response"].append(_read_capped_body)
+    # Повторы выполняет tenacity, поэтому собственные повторы адаптера отключены
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """
+    Возвращает асинхронный HTTP-клиент текущего event loop, создавая его при
+    первом обращении.
+
+    Повторный asyncio.run() получает новый клиент вместо соединений
+    завершённого loop.
+
+    Returns:
+        Экземпляр httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        # Клиенты завершённых loop использовать уже нельзя
+        for closed in [other for other in _ASYNC_CLIENTS if other.is_closed()]:
+            del _ASYNC_CLIENTS[closed]
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            http2=True, timeout=10, headers=_DEFAULT_HEADERS, follow_redirects=True
+        )
+    return client
+
+
+async def aclose_http_client() -> None:
+    """
+    Закрывает соединения асинхронного HTTP-клиента текущего event loop.
+
+    Пул соединений привязан к event loop, поэтому закрывать его нужно внутри
+    того же loop, до его завершения. После закрытия страницы можно загружать
+    дальше: следующий запрос откроет новый пул.
+    """
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _decode_html(content: bytes, encoding: str | None) -> str:
+    """
+    Декодирует HTML-контент страницы.
+
+    Args:
+        content: Байты страницы
+        encoding: Кодировка из заголовка Content-Type, если сервер её указал
+
+    Returns:
+        HTML-контент страницы
+    """
+    # Если сервер не указал кодировку, ищем <meta charset>, иначе считаем UTF-8
+    if not encoding:
+        match = _META_CHARSET_RE.search(content, 0, 2048)
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
 
-        Args:
-            url: URL страницы для загрузки
+    try:
+        return content.decode(encoding, errors="replace")
+    except LookupError:
+        # Указана неизвестная кодировка
+        return content.decode("utf-8", errors="replace")
 
-        Returns:
-            HTML-контент страницы
 
-        Raises:
-            requests.RequestException: При ошибках загрузки
-        """
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/91.0.4472.124 Safari/537.36"
-        }
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            logger.error(f"Ошибка при загрузке страницы {url}: {str(e)}")
-            raise
+def _check_content_type(url: str, content_type: str) -> None:
+    """
+    Проверяет, что сервер вернул HTML, до скачивания тела ответа.
 
-    @staticmethod
-    def extract_text(html: str) -> str:
-        """
-        Извлекает текстовый контент из HTML.
+    Args:
+        url: URL страницы
+        content_type: Значение заголовка Content-Type (пустое, если его нет)
 
-        Args:
-            html: HTML-контент
+    Raises:
+        ValueError: Если ответ не является HTML-документом
+    """
+    if not _is_html_type(content_type):
+        raise ValueError(
+            f"Страница {url} не является HTML-документом (Content-Type: {content_type})"
+        )
 
-        Returns:
-            Извлеченный текст
-        """
-        soup = BeautifulSoup(html, "html.parser")
 
-        # Удаляем скрипты и стили
-        for script in soup(["script", "style", "meta", "link"]):
-            script.decompose()
+def _check_text(text: str) -> None:
+    """
+    Проверяет, что со страницы извлечено достаточно текста для анализа.
+
+    extract_text() уже схлопывает пробелы и обрезает края строки,
+    поэтому достаточно проверить длину без повторного strip().
 
-        # Извлекаем текст
-        text = soup.get_text(separator=" ", strip=True)
+    Raises:
+        ValueError: Если текста слишком мало
+    """
+    if not text or len(text) < 50:
+        raise ValueError("Не удалось извлечь достаточное количество текста со страницы")
 
-        # Очищаем от лишних пробелов и переносов
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = " ".join(chunk for chunk in chunks if chunk)
 
-        return text
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_exception_type((requests.RequestException,)),
+)
+def fetch_html(url: str, refresh: bool = False) -> str:
+    """
+    Загружает HTML-контент по URL.
+
+    Args:
+        url: URL страницы для загрузки
+        refresh: Запросить страницу у сервера заново, минуя HTTP-кэш,
+                 и перезаписать сохранённую копию
+
+    Returns:
+        HTML-контент страницы (не более _MAX_HTML_BYTES байт)
+
+    Raises:
+        requests.RequestException: При ошибках загрузки
+        ValueError: Если ответ не является HTML-документом
+    """
+    try:
+        with _get_session().get(
+            url, timeout=10, stream=True, force_refresh=refresh
+        ) as response:
+            response.raise_for_status()
+            _check_content_type(url, response.headers.get("content-type", ""))
+            # Тело уже прочитано с ограничением _MAX_HTML_BYTES хуком сессии
+            # (или взято из кэша), поэтому content не скачивает страницу целиком
+            content = response.content[:_MAX_HTML_BYTES]
+
+        # response.apparent_encoding перечитывает весь ответ, что невозможно
+        # после потокового чтения, поэтому учитываем только явную кодировку
+        declared = "charset" in response.headers.get("content-type", "").lower()
+        return _decode_html(content, response.encoding if declared else None)
+    except requests.RequestException as e:
+        logger.error("Ошибка при загрузке страницы %s: %s", url, e)
+        raise
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_exception_type((httpx.HTTPError,)),
+)
+async def fetch_html_async(url: str) -> str:
+    """
+    Асинхронно загружает HTML-контент по URL.
+
+    Args:
+        url: URL страницы для загрузки
+
+    Returns:
+        HTML-контент страницы (не более _MAX_HTML_BYTES байт)
+
+    Raises:
+        httpx.HTTPError: При ошибках загрузки
+        ValueError: Если ответ не является HTML-документом
+    """
+    try:
+        async with _get_async_client().stream("GET", url) as response:
+            response.raise_for_status()
+            _check_content_type(url, response.headers.get("content-type", ""))
+
+            # Читаем не больше _MAX_HTML_BYTES, остаток страницы не скачиваем
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes(chunk_size=65536):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= _MAX_HTML_BYTES:
+                    break
+            content = b"".join(chunks)[:_MAX_HTML_BYTES]
+
+        return _decode_html(content, response.charset_encoding)
+    except httpx.HTTPError as e:
+        logger.error("Ошибка при загрузке страницы %s: %s", url, e)
+        raise
+
+
+def extract_text(html: str, max_chars: int | None = 32000) -> str:
+    """
+    Извлекает текстовый контент из HTML.
+
+    Args:
+        html: HTML-контент
+        max_chars: Максимальная длина текста (по умолчанию 32000 символов, что
+                  соответствует объёму, который имеет смысл отправлять в модель).
+                  None — без ограничения
+
+    Returns:
+        Извлеченный текст
+    """
+    # Пустую страницу нет смысла разбирать
+    if not html or html.isspace():
+        return ""
+
+    # BLAKE2b быстрее SHA-1 и не требует хранить сам HTML в ключе кэша
+    digest = hashlib.blake2b(
+        html.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    key = (digest, max_chars)
+    text = _TEXT_CACHE.get(key)
+    if text is None:
+        text = _extract_text(html, max_chars)
+        _TEXT_CACHE.set(key, text)
+    return text
+
+
+def _extract_text(html: str, max_chars: int | None) -> str:
+    """Разбирает HTML и извлекает текст; вызывается при промахе кэша."""
+    body = LexborHTMLParser(html).body
+    if body is None:
+        return ""
+
+    # Текст берётся только из <body>, поэтому <head> не обходим.
+    # Удаляем скрипты и стили за один обход дерева
+    for node in body.css(_SKIP_SELECTOR):
+        node.decompose()
+
+    # Обходим все текстовые узлы <body> в глубину и останавливаемся, как только
+    # набрали max_chars: остаток страницы модель всё равно не увидит
+    parts = []
+    size = 0
+    for node in body.traverse(include_text=True):
+        if node.tag != "-text":
+            continue
+        piece = node.text_content
+        if not piece or piece.isspace():
+            continue
+        parts.append(piece)
+        size += len(piece)
+        if max_chars is not None and size >= max_chars:
+            break
+
+    # Очищаем от лишних пробелов и переносов
+    text = _WS_RE.sub(" ", " ".join(parts)).strip()
+    return text[:max_chars] if max_chars is not None else text
+
+
+def _get_text(url: str, refresh: bool = False) -> str:
+    """
+    Возвращает текст страницы, загружая и разбирая её не более одного раза за процесс.
+
+    Args:
+        url: URL страницы
+        refresh: Загрузить страницу заново, минуя кэши, и обновить их
+
+    Returns:
+        Извлеченный текст
+    """
+    if not refresh:
+        text = _PAGE_TEXT_CACHE.get(url)
+        if text is not None:
+            return text
+
+    # Текст берётся целиком: клиент OpenAI сам оставит начало и конец текста,
+    # а в конце страницы находятся контакты и призывы к действию
+    text = extract_text(fetch_html(url, refresh=refresh), max_chars=None)
+    _PAGE_TEXT_CACHE.set(url, text)
+    return text
+
+
+async def _get_text_async(url: str) -> str:
+    """
+    Асинхронно загружает страницу и извлекает из неё текст.
+
+    Использует общий с _get_text() кэш текста по URL.
+
+    Args:
+        url: URL страницы
+
+    Returns:
+        Извлеченный текст
+    """
+    text = _PAGE_TEXT_CACHE.get(url)
+    if text is None:
+        text = extract_text(await fetch_html_async(url), max_chars=None)
+        _PAGE_TEXT_CACHE.set(url, text)
+    return text
 
 
 class QuestionGeneratorAgent:
@@ -100,16 +451,18 @@ class QuestionGeneratorAgent:
             model: Модель OpenAI для использования. Если не указано, читается из .env
                   (OPENAI_MODEL) или используется gpt-4o по умолчанию
         """
-        self.openai_client = OpenAIClient(model=model)
-        self.parser = PageParser()
+        self.openai_client = (
+            OpenAIClient(model=model) if model else get_default_client()
+        )
 
-    def run(self, url: str, num_questions: int = 5) -> List[str]:
+    def run(self, url: str, num_questions: int = 5, refresh: bool = False) -> List[str]:
         """
         Основной метод агента: парсит страницу и генерирует вопросы.
 
         Args:
             url: URL страницы для анализа
             num_questions: Количество вопросов для генерации (по умолчанию 5)
+            refresh: Загрузить страницу заново, минуя кэш страниц
 
         Returns:
             Список сгенерированных вопросов
@@ -118,32 +471,64 @@ class QuestionGeneratorAgent:
             Exception: При ошибках парсинга или генерации
         """
         try:
-            logger.info(f"Начинаю обработку URL: {url}")
+            logger.info("Начинаю обработку URL: %s", url)
 
-            # Шаг 1: Загружаем HTML
-            logger.info("Загрузка HTML...")
-            html = self.parser.fetch_html(url)
-
-            # Шаг 2: Извлекаем текст
-            logger.info("Извлечение текста из HTML...")
-            text = self.parser.extract_text(html)
+            # Шаг 1: Загружаем HTML и извлекаем текст
+            logger.info("Загрузка HTML и извлечение текста...")
+            text = _get_text(url, refresh=refresh)
 
-            if not text or len(text.strip()) < 50:
-                raise ValueError(
-                    "Не удалось извлечь достаточное количество текста со страницы"
-                )
+            _check_text(text)
 
-            logger.info(f"Извлечено {len(text)} символов текста")
+            logger.info("Извлечено %d символов текста", len(text))
 
-            # Шаг 3: Генерируем вопросы через OpenAI
+            # Шаг 2: Генерируем вопросы через OpenAI
             logger.info("Генерация вопросов через OpenAI...")
-            questions = self.openai_client.generate_questions(text, num_questions)
+            questions = _get_llm_cache().get_or_call(
+                self.openai_client.model,
+                "questions",
+                self.openai_client.generate_questions,
+                text,
+                settings=self.openai_client.cache_settings("questions"),
+                num_questions=num_questions,
+            )
+
+            logger.info("Сгенерировано %d вопросов", len(questions))
+            return questions
+
+        except Exception as e:
+            logger.error("Ошибка при выполнении агента: %s", e)
+            raise
+
+    async def run_async(self, url: str, num_questions: int = 5) -> List[str]:
+        """
+        Асинхронный вариант run() для обработки множества страниц в одном event loop.
+
+        Args:
+            url: URL страницы для анализа
+            num_questions: Количество вопросов для генерации (по умолчанию 5)
+
+        Returns:
+            Список сгенерированных вопросов
+        """
+        try:
+            logger.info("Начинаю обработку URL: %s", url)
+            text = await _get_text_async(url)
+            _check_text(text)
+
+            questions = await _get_llm_cache().aget_or_call(
+                self.openai_client.model,
+                "questions",
+                self.openai_client.agenerate_questions,
+                text,
+                settings=self.openai_client.cache_settings("questions"),
+                num_questions=num_questions,
+            )
 
-            logger.info(f"Сгенерировано {len(questions)} вопросов")
+            logger.info("Сгенерировано %d вопросов", len(questions))
             return questions
 
         except Exception as e:
-            logger.error(f"Ошибка при выполнении агента: {str(e)}")
+            logger.error("Ошибка при выполнении агента: %s", e)
             raise
 
 
@@ -158,15 +543,17 @@ class ContentClassifierAgent:
             model: Модель OpenAI для использования. Если не указано, читается из .env
                   (OPENAI_MODEL) или используется gpt-4o по умолчанию
         """
-        self.openai_client = OpenAIClient(model=model)
-        self.parser = PageParser()
+        self.openai_client = (
+            OpenAIClient(model=model) if model else get_default_client()
+        )
 
-    def run(self, url: str) -> Dict[str, str]:
+    def run(self, url: str, refresh: bool = False) -> Dict[str, str]:
         """
         Основной метод агента: парсит страницу и классифицирует тип контента.
 
         Args:
             url: URL страницы для анализа
+            refresh: Загрузить страницу заново, минуя кэш страниц
 
         Returns:
             Словарь с ключами 'type' (тип сайта) и 'explanation' (краткое объяснение)
@@ -175,32 +562,61 @@ class ContentClassifierAgent:
             Exception: При ошибках парсинга или классификации
         """
         try:
-            logger.info(f"Начинаю классификацию URL: {url}")
+            logger.info("Начинаю классификацию URL: %s", url)
 
-            # Шаг 1: Загружаем HTML
-            logger.info("Загрузка HTML...")
-            html = self.parser.fetch_html(url)
-
-            # Шаг 2: Извлекаем текст
-            logger.info("Извлечение текста из HTML...")
-            text = self.parser.extract_text(html)
+            # Шаг 1: Загружаем HTML и извлекаем текст
+            logger.info("Загрузка HTML и извлечение текста...")
+            text = _get_text(url, refresh=refresh)
 
-            if not text or len(text.strip()) < 50:
-                raise ValueError(
-                    "Не удалось извлечь достаточное количество текста со страницы"
-                )
+            _check_text(text)
 
-            logger.info(f"Извлечено {len(text)} символов текста")
+            logger.info("Извлечено %d символов текста", len(text))
 
-            # Шаг 3: Классифицируем контент через OpenAI
+            # Шаг 2: Классифицируем контент через OpenAI
             logger.info("Классификация контента через OpenAI...")
-            classification = self.openai_client.classify_content(text)
+            classification = _get_llm_cache().get_or_call(
+                self.openai_client.model,
+                "classify",
+                self.openai_client.classify_content,
+                text,
+                settings=self.openai_client.cache_settings("classify"),
+            )
+
+            logger.info("Тип сайта определен: %s", classification["type"])
+            return classification
+
+        except Exception as e:
+            logger.error("Ошибка при выполнении классификации: %s", e)
+            raise
+
+    async def run_async(self, url: str) -> Dict[str, str]:
+        """
+        Асинхронный вариант run() для обработки множества страниц в одном event loop.
+
+        Args:
+            url: URL страницы для анализа
+
+        Returns:
+            Словарь с ключами 'type' (тип сайта) и 'explanation' (краткое объяснение)
+        """
+        try:
+            logger.info("Начинаю классификацию URL: %s", url)
+            text = await _get_text_async(url)
+            _check_text(text)
+
+            classification = await _get_llm_cache().aget_or_call(
+                self.openai_client.model,
+                "classify",
+                self.openai_client.aclassify_content,
+                text,
+                settings=self.openai_client.cache_settings("classify"),
+            )
 
-            logger.info(f"Тип сайта определен: {classification['type']}")
+            logger.info("Тип сайта определен: %s", classification["type"])
             return classification
 
         except Exception as e:
-            logger.error(f"Ошибка при выполнении классификации: {str(e)}")
+            logger.error("Ошибка при выполнении классификации: %s", e)
             raise
 
 
@@ -215,16 +631,20 @@ class UXReviewerAgent:
             model: Модель OpenAI для использования. Если не указано, читается из .env
                   (OPENAI_MODEL) или используется gpt-4o по умолчанию
         """
-        self.openai_client = OpenAIClient(model=model)
-        self.parser = PageParser()
+        self.openai_client = (
+            OpenAIClient(model=model) if model else get_default_client()
+        )
 
-    def run(self, url: str, num_recommendations: int = 5) -> Dict[str, List[str]]:
+    def run(
+        self, url: str, num_recommendations: int = 5, refresh: bool = False
+    ) -> Dict[str, List[str]]:
         """
         Основной метод агента: парсит страницу и генерирует UX-отчёт.
 
         Args:
             url: URL страницы для анализа
             num_recommendations: Количество рекомендаций (по умолчанию 5)
+            refresh: Загрузить страницу заново, минуя кэш страниц
 
         Returns:
             Словарь с ключами:
@@ -236,34 +656,72 @@ class UXReviewerAgent:
             Exception: При ошибках парсинга или генерации
         """
         try:
-            logger.info(f"Начинаю UX-анализ URL: {url}")
+            logger.info("Начинаю UX-анализ URL: %s", url)
 
-            # Шаг 1: Загружаем HTML
-            logger.info("Загрузка HTML...")
-            html = self.parser.fetch_html(url)
-
-            # Шаг 2: Извлекаем текст
-            logger.info("Извлечение текста из HTML...")
-            text = self.parser.extract_text(html)
+            # Шаг 1: Загружаем HTML и извлекаем текст
+            logger.info("Загрузка HTML и извлечение текста...")
+            text = _get_text(url, refresh=refresh)
 
-            if not text or len(text.strip()) < 50:
-                raise ValueError(
-                    "Не удалось извлечь достаточное количество текста со страницы"
-                )
+            _check_text(text)
 
-            logger.info(f"Извлечено {len(text)} символов текста")
+            logger.info("Извлечено %d символов текста", len(text))
 
-            # Шаг 3: Генерируем UX-отчёт через OpenAI
+            # Шаг 2: Генерируем UX-отчёт через OpenAI
             logger.info("Генерация UX-отчёта через OpenAI...")
-            ux_report = self.openai_client.generate_ux_report(text, num_recommendations)
+            ux_report = _get_llm_cache().get_or_call(
+                self.openai_client.model,
+                "ux_report",
+                self.openai_client.generate_ux_report,
+                text,
+                settings=self.openai_client.cache_settings("ux_report"),
+                num_recommendations=num_recommendations,
+            )
+
+            logger.info(
+                "UX-отчёт сгенерирован: %d рекомендаций",
+                len(ux_report["recommendations"]),
+            )
+            return ux_report
+
+        except Exception as e:
+            logger.error("Ошибка при выполнении UX-анализа: %s", e)
+            raise
+
+    async def run_async(
+        self, url: str, num_recommendations: int = 5
+    ) -> Dict[str, List[str]]:
+        """
+        Асинхронный вариант run() для обработки множества страниц в одном event loop.
+
+        Args:
+            url: URL страницы для анализа
+            num_recommendations: Количество рекомендаций (по умолчанию 5)
+
+        Returns:
+            Словарь с ключами 'strengths', 'weaknesses' и 'recommendations'
+        """
+        try:
+            logger.info("Начинаю UX-анализ URL: %s", url)
+            text = await _get_text_async(url)
+            _check_text(text)
+
+            ux_report = await _get_llm_cache().aget_or_call(
+                self.openai_client.model,
+                "ux_report",
+                self.openai_client.agenerate_ux_report,
+                text,
+                settings=self.openai_client.cache_settings("ux_report"),
+                num_recommendations=num_recommendations,
+            )
 
             logger.info(
-                f"UX-отчёт сгенерирован: {len(ux_report['recommendations'])} рекомендаций"
+                "UX-отчёт сгенерирован: %d рекомендаций",
+                len(ux_report["recommendations"]),
             )
             return ux_report
 
         except Exception as e:
-            logger.error(f"Ошибка при выполнении UX-анализа: {str(e)}")
+            logger.error("Ошибка при выполнении UX-анализа: %s", e)
             raise
 
 
@@ -278,18 +736,28 @@ class SiteAgent:
             model: Модель OpenAI для использования. Если не указано, читается из .env
                   (OPENAI_MODEL) или используется gpt-4o по умолчанию
         """
-        self.question_generator = QuestionGeneratorAgent(model=model)
-        self.content_classifier = ContentClassifierAgent(model=model)
-        self.ux_reviewer = UXReviewerAgent(model=model)
-        self.parser = PageParser()
-
-    def run_all(self, url: str, num_questions: int = 5) -> Dict:
+        self.openai_client = (
+            OpenAIClient(model=model) if model else get_default_client()
+        )
+
+    def run_all(
+        self,
+        url: str,
+        num_questions: int = 5,
+        num_recommendations: int = 5,
+        refresh: bool = False,
+    ) -> Dict:
         """
         Выполняет все доступные задачи на странице.
 
+        Все задачи выполняются одним запросом к OpenAI, поэтому текст страницы
+        отправляется в модель один раз.
+
         Args:
             url: URL страницы для анализа
             num_questions: Количество вопросов для генерации (по умолчанию 5)
+            num_recommendations: Количество рекомендаций (по умолчанию 5)
+            refresh: Загрузить страницу заново, минуя кэш страниц
 
         Returns:
             Словарь с результатами всех задач:
@@ -300,40 +768,62 @@ class SiteAgent:
             }
         """
         try:
-            logger.info(f"Выполняю все задачи для URL: {url}")
+            logger.info("Выполняю все задачи для URL: %s", url)
 
             # Загружаем HTML один раз
             logger.info("Загрузка HTML...")
-            html = self.parser.fetch_html(url)
-            text = self.parser.extract_text(html)
+            text = _get_text(url, refresh=refresh)
 
-            if not text or len(text.strip()) < 50:
-                raise ValueError(
-                    "Не удалось извлечь достаточное количество текста со страницы"
-                )
+            _check_text(text)
 
-            logger.info(f"Извлечено {len(text)} символов текста")
+            logger.info("Извлечено %d символов текста", len(text))
 
-            # Выполняем задачи последовательно
-            logger.info("Генерация вопросов...")
-            questions = self.question_generator.openai_client.generate_questions(
-                text, num_questions
+            logger.info("Генерация вопросов, классификация и UX-анализ...")
+            return _get_llm_cache().get_or_call(
+                self.openai_client.model,
+                "all",
+                self.openai_client.generate_all,
+                text,
+                settings=self.openai_client.cache_settings("all"),
+                num_questions=num_questions,
+                num_recommendations=num_recommendations,
             )
 
-            logger.info("Классификация контента...")
-            content_type = self.content_classifier.openai_client.classify_content(text)
+        except Exception as e:
+            logger.error("Ошибка при выполнении задач: %s", e)
+            raise
+
+    async def run_all_async(
+        self, url: str, num_questions: int = 5, num_recommendations: int = 5
+    ) -> Dict:
+        """
+        Асинхронный вариант run_all().
 
-            logger.info("Генерация UX-отчёта...")
-            ux_report = self.ux_reviewer.openai_client.generate_ux_report(text)
+        Args:
+            url: URL страницы для анализа
+            num_questions: Количество вопросов для генерации (по умолчанию 5)
+            num_recommendations: Количество рекомендаций (по умолчанию 5)
 
-            return {
-                "questions": questions,
-                "content_type": content_type,
-                "ux_report": ux_report,
-            }
+        Returns:
+            Словарь с ключами 'questions', 'content_type' и 'ux_report'
+        """
+        try:
+            logger.info("Выполняю все задачи для URL: %s", url)
+            text = await _get_text_async(url)
+            _check_text(text)
+
+            return await _get_llm_cache().aget_or_call(
+                self.openai_client.model,
+                "all",
+                self.openai_client.agenerate_all,
+                text,
+                settings=self.openai_client.cache_settings("all"),
+                num_questions=num_questions,
+                num_recommendations=num_recommendations,
+            )
 
         except Exception as e:
-            logger.error(f"Ошибка при выполнении задач: {str(e)}")
+            logger.error("Ошибка при выполнении задач: %s", e)
             raise
 
 
@@ -341,6 +831,14 @@ def main() -> None:
     """Основная функция для запуска агента из командной строки."""
     import sys
 
+    # Загружаем переменные окружения и настраиваем логирование только при запуске
+    # из командной строки, чтобы импорт модуля не менял конфигурацию приложения
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
     if len(sys.argv) < 2:
         print("Использование: python agent.py <URL> [задача]")
         print("\nДоступные задачи:")
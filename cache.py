@@ -0,0 +1,369 @@
+"""Модуль для кэширования ответов OpenAI и промежуточных результатов."""
+
+import asyncio
+import copy
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple
+
+import orjson
+from diskcache import Cache
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш в памяти процесса."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное количество записей
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Возвращает значение по ключу или None, если записи нет.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Сохранённое значение или None
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        Args:
+            key: Ключ записи
+            value: Значение
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class SemanticCache:
+    """
+    Семантический кэш ответов модели.
+
+    Текст страницы переводится в эмбеддинг (sentence-transformers), и если
+    в индексе FAISS уже есть достаточно похожий текст для той же модели,
+    задачи и параметров, возвращается сохранённый для него ответ.
+    Модель эмбеддингов учитывает только начало текста, поэтому кэш стоит
+    включать для задач, где близкие страницы действительно дают один ответ.
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[str],
+        directory: str = ".semantic_cache",
+        threshold: float = 0.95,
+        model_name: str = "all-MiniLM-L6-v2",
+        skip_if: Callable[[Any], bool] | None = None,
+    ) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            tasks: Задачи, для которых включён поиск похожих ответов
+            directory: Директория для хранения индексов
+            threshold: Минимальное косинусное сходство для попадания в кэш
+            model_name: Модель sentence-transformers для эмбеддингов
+            skip_if: Проверка ответа, который не нужно сохранять
+                (например, заглушки при ошибке разбора)
+
+        Raises:
+            ImportError: Если не установлены sentence-transformers или faiss
+        """
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "Для семантического кэша установите зависимости: "
+                "pip install sentence-transformers faiss-cpu"
+            ) from e
+
+        self._faiss = faiss
+        self.encoder = SentenceTransformer(model_name)
+        self.tasks = frozenset(tasks)
+        self.directory = directory
+        self.threshold = threshold
+        self.skip_if = skip_if
+        # Отдельный индекс и список ответов на каждую комбинацию модели,
+        # задачи и параметров
+        self._indexes: Dict[str, Tuple[Any, List[Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> Any:
+        """Возвращает нормализованный эмбеддинг текста (float32, 1 x dim)."""
+        return self.encoder.encode(
+            [text], normalize_embeddings=True, convert_to_numpy=True
+        ).astype("float32")
+
+    def _namespace(self, namespace: str) -> Tuple[Any, List[Any]]:
+        """Возвращает индекс и ответы пространства, загружая их с диска."""
+        entry = self._indexes.get(namespace)
+        if entry is None:
+            index_path = os.path.join(self.directory, f"{namespace}.faiss")
+            values_path = os.path.join(self.directory, f"{namespace}.pkl")
+            if os.path.exists(index_path) and os.path.exists(values_path):
+                index = self._faiss.read_index(index_path)
+                with open(values_path, "rb") as f:
+                    values = pickle.load(f)
+            else:
+                dim = self.encoder.get_sentence_embedding_dimension()
+                # Скалярное произведение нормализованных векторов — косинусное сходство
+                index = self._faiss.IndexFlatIP(dim)
+                values = []
+            entry = self._indexes[namespace] = (index, values)
+        return entry
+
+    def _lookup(self, namespace: str, embedding: Any) -> Any:
+        """Ищет ответ для ближайшего текста, если он достаточно похож."""
+        with self._lock:
+            index, values = self._namespace(namespace)
+            if index.ntotal == 0:
+                return None
+            scores, ids = index.search(embedding, 1)
+            if scores[0][0] >= self.threshold:
+                return values[ids[0][0]]
+            return None
+
+    def _add(self, namespace: str, embedding: Any, value: Any) -> None:
+        """Добавляет ответ в индекс и сохраняет пространство на диск."""
+        with self._lock:
+            index, values = self._namespace(namespace)
+            index.add(embedding)
+            values.append(value)
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._faiss.write_index(
+                index, os.path.join(self.directory, f"{namespace}.faiss")
+            )
+            with open(os.path.join(self.directory, f"{namespace}.pkl"), "wb") as f:
+                pickle.dump(values, f)
+
+    def get_or_call(
+        self,
+        model: str,
+        task: str,
+        func: Callable[..., Any],
+        text: str,
+        settings: Dict[str, Any] | None = None,
+        **params: Any,
+    ) -> Any:
+        """
+        Возвращает ответ для похожего текста или вызывает модель.
+
+        Args:
+            model: Название модели OpenAI
+            task: Название задачи
+            func: Метод клиента OpenAI, вызываемый как func(text, **params)
+            text: Текст страницы
+            settings: Настройки клиента, влияющие на ответ (например,
+                temperature); входят в ключ, но не передаются в func
+            **params: Дополнительные параметры задачи
+
+        Returns:
+            Ответ модели
+        """
+        if task not in self.tasks:
+            return func(text, **params)
+
+        namespace = LLMCache.cache_key(model, task, "", **params, **(settings or {}))
+        embedding = self._embed(text)
+        value = self._lookup(namespace, embedding)
+        if value is None:
+            value = func(text, **params)
+            if self.skip_if is None or not self.skip_if(value):
+                self._add(namespace, embedding, value)
+        return value
+
+    async def aget_or_call(
+        self,
+        model: str,
+        task: str,
+        func: Callable[..., Awaitable[Any]],
+        text: str,
+        settings: Dict[str, Any] | None = None,
+        **params: Any,
+    ) -> Any:
+        """Асинхронный вариант get_or_call() для корутинных методов клиента."""
+        if task not in self.tasks:
+            return await func(text, **params)
+
+        namespace = LLMCache.cache_key(model, task, "", **params, **(settings or {}))
+        # Вычисление эмбеддинга нагружает CPU, поэтому не блокируем event loop
+        embedding = await asyncio.to_thread(self._embed, text)
+        value = self._lookup(namespace, embedding)
+        if value is None:
+            value = await func(text, **params)
+            if self.skip_if is None or not self.skip_if(value):
+                self._add(namespace, embedding, value)
+        return value
+
+
+class LLMCache:
+    """Дисковый кэш ответов модели с ключом по хэшу входных данных."""
+
+    def __init__(
+        self,
+        directory: str = ".llm_cache",
+        expire: int = 86400,
+        semantic: SemanticCache | None = None,
+        memory_size: int = 512,
+        skip_if: Callable[[Any], bool] | None = None,
+    ) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            directory: Директория для хранения кэша
+            expire: Время жизни записи в секундах (по умолчанию 24 часа)
+            semantic: Семантический кэш, к которому обращаться при промахе
+                по точному ключу
+            memory_size: Количество ответов, хранимых в памяти процесса
+            skip_if: Проверка ответа, который не нужно сохранять
+                (например, заглушки при ошибке разбора)
+        """
+        self.cache = Cache(directory)
+        self.expire = expire
+        self.semantic = semantic
+        # Повторные запросы в рамках одного запуска не читают диск
+        self.memory = LRUCache(maxsize=memory_size)
+        self.skip_if = skip_if
+
+    @staticmethod
+    def memory_key(model: str, task: str, text: str, **params: Any) -> Tuple:
+        """
+        Вычисляет ключ кэша в памяти процесса.
+
+        Текст представлен 16-байтовым BLAKE2b-хэшем, поэтому ключ не держит
+        в памяти сам текст страницы.
+
+        Args:
+            model: Название модели OpenAI
+            task: Название задачи
+            text: Текст страницы
+            **params: Дополнительные параметры задачи
+
+        Returns:
+            Кортеж, пригодный для использования в качестве ключа словаря
+        """
+        digest = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        return model, task, digest, tuple(sorted(params.items()))
+
+    @staticmethod
+    def cache_key(model: str, task: str, text: str, **params: Any) -> str:
+        """
+        Вычисляет ключ кэша для запроса к модели.
+
+        Args:
+            model: Название модели OpenAI
+            task: Название задачи (questions, classify, ux_report и т.д.)
+            text: Текст страницы, отправляемый в модель
+            **params: Дополнительные параметры задачи
+
+        Returns:
+            SHA-256 хэш запроса в шестнадцатеричном виде
+        """
+        # orjson сериализует длинный текст страницы заметно быстрее json.dumps
+        payload = orjson.dumps(
+            {"model": model, "task": task, "text": text, "params": params},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_or_call(
+        self,
+        model: str,
+        task: str,
+        func: Callable[..., Any],
+        text: str,
+        settings: Dict[str, Any] | None = None,
+        **params: Any,
+    ) -> Any:
+        """
+        Возвращает закэшированный ответ или вызывает модель и сохраняет результат.
+
+        Args:
+            model: Название модели OpenAI
+            task: Название задачи
+            func: Метод клиента OpenAI, вызываемый как func(text, **params)
+            text: Текст страницы
+            settings: Настройки клиента, влияющие на ответ (например,
+                temperature); входят в ключ, но не передаются в func
+            **params: Дополнительные параметры задачи
+
+        Returns:
+            Ответ модели
+        """
+        key_params = {**params, **(settings or {})}
+        memory_key = self.memory_key(model, task, text, **key_params)
+        value = self.memory.get(memory_key)
+        if value is None:
+            key = self.cache_key(model, task, text, **key_params)
+            value = self.cache.get(key)
+            if value is None:
+                if self.semantic is not None:
+                    value = self.semantic.get_or_call(
+                        model, task, func, text, settings, **params
+                    )
+                else:
+                    value = func(text, **params)
+                if self.skip_if is not None and self.skip_if(value):
+                    # Заглушку не сохраняем: повторный запрос может быть успешным
+                    return value
+                self.cache.set(key, value, expire=self.expire)
+            self.memory.set(memory_key, value)
+        # Копия, чтобы изменения у вызывающего кода не попали в кэш
+        return copy.deepcopy(value)
+
+    async def aget_or_call(
+        self,
+        model: str,
+        task: str,
+        func: Callable[..., Awaitable[Any]],
+        text: str,
+        settings: Dict[str, Any] | None = None,
+        **params: Any,
+    ) -> Any:
+        """Асинхронный вариант get_or_call() для корутинных методов клиента."""
+        key_params = {**params, **(settings or {})}
+        memory_key = self.memory_key(model, task, text, **key_params)
+        value = self.memory.get(memory_key)
+        if value is None:
+            key = self.cache_key(model, task, text, **key_params)
+            value = self.cache.get(key)
+            if value is None:
+                if self.semantic is not None:
+                    value = await self.semantic.aget_or_call(
+                        model, task, func, text, settings, **params
+                    )
+                else:
+                    value = await func(text, **params)
+                if self.skip_if is not None and self.skip_if(value):
+                    # Заглушку не сохраняем: повторный запрос может быть успешным
+                    return value
+                self.cache.set(key, value, expire=self.expire)
+            self.memory.set(memory_key, value)
+        return copy.deepcopy(value)
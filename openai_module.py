@@ -1,47 +1,705 @@
 """Модуль для работы с OpenAI API."""
 
+import asyncio
+import atexit
+import hashlib
+import inspect
 import os
-from typing import Dict, List
+import re
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Callable, Dict, List
 
+import httpx
+import orjson
+import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    DefaultAioHttpClient,
+    DefaultHttpxClient,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 from tenacity import (
+    RetryCallState,
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_exponential_jitter,
     retry_if_exception_type,
 )
 
-# Загружаем переменные окружения
-load_dotenv()
+# Лимиты пула соединений и таймауты HTTP-клиентов OpenAI
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Общий пул соединений синхронных клиентов: TCP- и TLS-соединения переиспользуются
+# всеми экземплярами OpenAIClient, а HTTP/2 мультиплексирует запросы
+_HTTP_CLIENT = DefaultHttpxClient(
+    http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+)
+
+# Ошибки API, которые имеет смысл повторять: сеть, таймауты, 429 и 5xx.
+# Ошибки запроса (400, 401, 404) при повторе не исчезнут.
+_TRANSIENT_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    RateLimitError,
+    InternalServerError,
+)
+
+# Экспоненциальная задержка с джиттером, чтобы параллельные запросы
+# не повторялись одновременно
+_RETRY_WAIT = wait_exponential_jitter(initial=2, max=10)
+_MAX_RETRY_AFTER = 60.0
+
+
+def _wait_retry_after(retry_state: RetryCallState) -> float:
+    """
+    Вычисляет задержку перед повтором запроса.
+
+    Для ответа 429 используется заголовок Retry-After, если сервер его прислал,
+    иначе экспоненциальная задержка с джиттером.
+
+    Args:
+        retry_state: Состояние текущей попытки tenacity
+
+    Returns:
+        Задержка в секундах
+    """
+    error = retry_state.outcome.exception()
+    if isinstance(error, RateLimitError):
+        try:
+            return min(float(error.response.headers["retry-after"]), _MAX_RETRY_AFTER)
+        except (KeyError, ValueError):
+            pass
+    return _RETRY_WAIT(retry_state)
+
+
+# Общая политика повторов для всех запросов к модели
+_RETRY = retry(
+    stop=stop_after_attempt(3),
+    wait=_wait_retry_after,
+    retry=retry_if_exception_type(_TRANSIENT_ERRORS),
+    reraise=True,
+)
+
+
+class OpenAIClientError(Exception):
+    """Ошибка при выполнении задачи через OpenAI API."""
+
+
+def _openai_call(label: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Оборачивает метод клиента повторами и единой обработкой ошибок.
+
+    Временные ошибки API повторяются tenacity и после исчерпания попыток
+    пробрасываются как есть, OpenAIClientError тоже пробрасывается как есть,
+    остальные ошибки оборачиваются в OpenAIClientError.
+    Поддерживаются как обычные методы, так и корутины.
+
+    Args:
+        label: Описание задачи для сообщения об ошибке
+            (например, "генерации вопросов")
+
+    Returns:
+        Декоратор метода
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return await func(*args, **kwargs)
+                except (*_TRANSIENT_ERRORS, OpenAIClientError):
+                    # Временные ошибки пробрасываем как есть, чтобы их повторил tenacity,
+                    # а уже сформулированные ошибки клиента - без повторной обёртки
+                    raise
+                except Exception as e:
+                    raise OpenAIClientError(
+                        f"Ошибка при {label} через OpenAI: {str(e)}"
+                    ) from e
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return func(*args, **kwargs)
+                except (*_TRANSIENT_ERRORS, OpenAIClientError):
+                    raise
+                except Exception as e:
+                    raise OpenAIClientError(
+                        f"Ошибка при {label} через OpenAI: {str(e)}"
+                    ) from e
+
+        return _RETRY(wrapper)
+
+    return decorator
+
+
+# Маркеры списка и нумерация в начале строки с вопросом
+_LEAD_MARKERS_RE = re.compile(r"^[\s\-*•0-9.]+")
+
+# Заголовок секции UX-отчёта (в том числе с разметкой Markdown и номером)
+_UX_HEADER_RE = re.compile(
+    r"^[ \t#*]*(?:\d+\.[ \t]*)?[ \t*]*"
+    r"(достоинств|слаб(?:ые|ое) мест|рекомендаци)[^\n]*",
+    re.MULTILINE | re.IGNORECASE,
+)
+# Пункт секции: строка с необязательным маркером списка или номером.
+# Пункт должен содержать букву или цифру, поэтому разделители Markdown
+# (---, ***, ___) пропускаются
+_UX_ITEM_RE = re.compile(
+    r"^[ \t]*(?:(?:[-•*]|\d+\.)[ \t]*|(?![-•*]))(?=[^\n]*[^\W_])(\S[^\n]*)$",
+    re.MULTILINE,
+)
+_UX_SECTIONS = {"дост": "strengths", "слаб": "weaknesses", "реко": "recommendations"}
+
+# Заглушки, которые возвращаются вместо ответа модели, если его не удалось разобрать
+_FALLBACK_QUESTIONS = "Не удалось сгенерировать вопросы"
+_FALLBACK_TYPE = "Неизвестный тип"
+_FALLBACK_EXPLANATION = "Не удалось определить объяснение"
+_FALLBACK_RECOMMENDATIONS = "Не удалось сгенерировать рекомендации"
+_FALLBACKS = frozenset(
+    (
+        _FALLBACK_QUESTIONS,
+        _FALLBACK_TYPE,
+        _FALLBACK_EXPLANATION,
+        _FALLBACK_RECOMMENDATIONS,
+    )
+)
+
+# Версия формата запросов и разбора ответов. Увеличивается при изменениях,
+# которые не видны по тексту промптов (max_tokens, схема, парсеры), чтобы
+# кэш не отдавал ответы, полученные старым кодом
+_CACHE_VERSION = 1
+
+# Пронумерованный пункт (1.-9.) для разбора ответа без заголовков секций
+_NUMBERED_ITEM_RE = re.compile(r"^[ \t]*[1-9]\.(.*)$", re.MULTILINE)
+
+# Сколько токенов начала и конца текста страницы отправлять в модель.
+# Для классификации важнее начало страницы, для UX - ещё и подвал с CTA
+_QUESTIONS_TOKENS = (3000, 1000)
+_CLASSIFY_TOKENS = (3000, 1000)
+_UX_TOKENS = (2000, 2000)
+_ALL_TOKENS = (2000, 2000)
+# Оценка длины токена в символах, если словарь токенизатора недоступен
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Загружает токенизатор модели один раз на модель.
+
+    Args:
+        model: Название модели OpenAI
+
+    Returns:
+        Токенизатор tiktoken
+
+    Raises:
+        Exception: Если словарь токенизатора не удалось загрузить
+    """
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        # Неизвестная tiktoken модель: используем словарь семейства gpt-4o
+        name = "o200k_base"
+    return tiktoken.get_encoding(name)
+
+
+def _get_encoding(model: str) -> tiktoken.Encoding | None:
+    """
+    Возвращает токенизатор модели.
+
+    Неудачная загрузка не кэшируется, поэтому при следующем вызове
+    словарь запрашивается снова.
+
+    Args:
+        model: Название модели OpenAI
+
+    Returns:
+        Токенизатор tiktoken или None, если словарь не удалось загрузить
+    """
+    try:
+        return _load_encoding(model)
+    except Exception:
+        # Словарь скачивается при первом использовании и может быть недоступен
+        return None
+
+
+def _truncate_text(text: str, model: str, head: int, tail: int) -> str:
+    """
+    Сокращает длинный текст до начала и конца с заданным числом токенов.
+
+    Args:
+        text: Текст страницы
+        model: Название модели OpenAI (определяет токенизатор)
+        head: Количество токенов начала текста
+        tail: Количество токенов конца текста
+
+    Returns:
+        Исходный текст, если он короче head + tail токенов, иначе начало
+        и конец текста, разделённые многоточием
+    """
+    # Байтовый BPE даёт не больше токенов, чем байт в UTF-8,
+    # поэтому короткий текст не нужно токенизировать
+    if len(text.encode("utf-8", "surrogatepass")) <= head + tail:
+        return text
+
+    encoding = _get_encoding(model)
+    if encoding is None:
+        head, tail = head * _CHARS_PER_TOKEN, tail * _CHARS_PER_TOKEN
+        if len(text) <= head + tail:
+            return text
+        return f"{text[:head]}\n...\n{text[-tail:]}"
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= head + tail:
+        return text
+    return (
+        f"{encoding.decode(tokens[:head])}\n...\n{encoding.decode(tokens[-tail:])}"
+    )
+
+
+# JSON-схема ответа generate_all() для Structured Outputs
+_STRING_LIST_SCHEMA = {"type": "array", "items": {"type": "string"}}
+_ALL_TASKS_SCHEMA = {
+    "name": "site_analysis",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "questions": _STRING_LIST_SCHEMA,
+            "content_type": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string"},
+                    "explanation": {"type": "string"},
+                },
+                "required": ["type", "explanation"],
+                "additionalProperties": False,
+            },
+            "ux_report": {
+                "type": "object",
+                "properties": {
+                    "strengths": _STRING_LIST_SCHEMA,
+                    "weaknesses": _STRING_LIST_SCHEMA,
+                    "recommendations": _STRING_LIST_SCHEMA,
+                },
+                "required": ["strengths", "weaknesses", "recommendations"],
+                "additionalProperties": False,
+            },
+        },
+        "required": ["questions", "content_type", "ux_report"],
+        "additionalProperties": False,
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def _get_config() -> Dict[str, Any]:
+    """
+    Загружает .env и читает настройки клиента один раз за процесс.
+
+    Returns:
+        Словарь с ключами 'api_key', 'model', 'max_concurrency'
+        и 'requests_per_minute'
+
+    Raises:
+        ValueError: Если не задан OPENAI_API_KEY
+    """
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OPENAI_API_KEY не найден в переменных окружения. "
+            "Создайте файл .env и добавьте OPENAI_API_KEY=your_key"
+        )
+    return {
+        "api_key": api_key,
+        "model": os.getenv("OPENAI_MODEL", "gpt-4o"),
+        "max_concurrency": int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+        "requests_per_minute": int(os.getenv("OPENAI_RPM", "0")),
+    }
+
+
+def is_fallback_result(result: Any) -> bool:
+    """
+    Проверяет, содержит ли результат задачи заглушку вместо ответа модели.
+
+    Такие результаты не стоит кэшировать: повторный запрос может быть успешным.
+
+    Args:
+        result: Результат задачи (строка, список или словарь)
+
+    Returns:
+        True, если в результате есть заглушка
+    """
+    if isinstance(result, str):
+        return result in _FALLBACKS
+    if isinstance(result, dict):
+        return any(is_fallback_result(value) for value in result.values())
+    if isinstance(result, list):
+        return any(is_fallback_result(value) for value in result)
+    return False
+
+
+class _RateLimiter:
+    """Ограничитель частоты запросов по алгоритму token bucket."""
+
+    def __init__(self, requests_per_minute: int) -> None:
+        """
+        Инициализация ограничителя.
+
+        Args:
+            requests_per_minute: Допустимое количество запросов в минуту
+        """
+        self.capacity = float(requests_per_minute)
+        self.rate = requests_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Ожидает, пока в корзине не появится токен, и забирает его."""
+        # Ожидающие запросы обслуживаются по очереди под общей блокировкой
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _AsyncResources:
+    """Асинхронный клиент и лимиты запросов, привязанные к одному event loop."""
+
+    def __init__(
+        self, api_key: str, max_concurrency: int, requests_per_minute: int
+    ) -> None:
+        """
+        Инициализация ресурсов.
+
+        Args:
+            api_key: Ключ OpenAI API
+            max_concurrency: Максимум одновременных запросов
+            requests_per_minute: Ограничение запросов в минуту (0 — без ограничения)
+        """
+        # Транспорт aiohttp: пул httpx деградирует при сотнях параллельных запросов
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=DefaultAioHttpClient(
+                limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = (
+            _RateLimiter(requests_per_minute) if requests_per_minute else None
+        )
 
 
 class OpenAIClient:
     """Клиент для работы с OpenAI API."""
 
-    def __init__(self, model: str | None = None) -> None:
+    # Статичные инструкции задач. Они передаются в system-сообщении первыми,
+    # а текст страницы и количества - в конце user-сообщения, поэтому префикс
+    # запроса одинаков для всех страниц. Кэш промптов OpenAI срабатывает
+    # только с 1024 токенов, а инструкции короче; дополнять их ради кэша
+    # не стоит: каждый запрос стал бы дороже, чем сэкономит скидка
+    _QUESTIONS_SYSTEM_PROMPT = (
+        "Ты помощник, который анализирует контент "
+        "и формулирует вопросы от лица пользователя. "
+        "Ты пользователь. Какие вопросы у тебя возникли после "
+        "прочтения текста? Сформулируй логичные вопросы, которые "
+        "могли бы задать пользователи. Верни только список "
+        "вопросов, каждый вопрос с новой строки, без нумерации "
+        "и дополнительных пояснений."
+    )
+
+    _CLASSIFY_SYSTEM_PROMPT = (
+        "Ты эксперт по классификации веб-сайтов. "
+        "Анализируй контент и определяй тип сайта на основе "
+        "структуры, содержания и назначения.\n\n"
+        "Классифицируй сайт на основе текста. Определи тип сайта "
+        "(например: лендинг, блог, маркетплейс, корпоративный сайт, "
+        "новостной портал, форум, социальная сеть и т.д.).\n\n"
+        "Верни ответ в формате:\n"
+        "Тип: [тип сайта]\n"
+        "Объяснение: [краткое объяснение, почему именно этот тип]"
+    )
+
+    _UX_SYSTEM_PROMPT = (
+        "Ты опытный UX-эксперт с глубоким пониманием "
+        "пользовательского опыта, юзабилити и дизайна интерфейсов. "
+        "Ты анализируешь сайты и даёшь конструктивные рекомендации "
+        "по улучшению пользовательского опыта.\n\n"
+        "Проанализируй текст сайта и создай UX-отчёт.\n\n"
+        "Верни отчёт в следующем формате:\n"
+        "Достоинства:\n"
+        "- [достоинство 1]\n"
+        "- [достоинство 2]\n"
+        "- [достоинство 3]\n\n"
+        "Слабые места:\n"
+        "- [слабое место 1]\n"
+        "- [слабое место 2]\n"
+        "- [слабое место 3]\n\n"
+        "Рекомендации по улучшению UX:\n"
+        "1. [рекомендация 1]\n"
+        "2. [рекомендация 2]\n"
+        "3. [рекомендация 3]\n"
+        "4. [рекомендация 4]\n"
+        "5. [рекомендация 5]\n\n"
+        "Рекомендации должны быть конкретными и практичными."
+    )
+
+    _ALL_SYSTEM_PROMPT = (
+        "Ты эксперт по анализу веб-сайтов: формулируешь "
+        "вопросы от лица пользователя, классифицируешь тип сайта "
+        "и даёшь конструктивные рекомендации по улучшению "
+        "пользовательского опыта.\n\n"
+        "Проанализируй текст сайта и выполни три задачи:\n"
+        "1. Представь, что ты пользователь, и сформулируй заданное "
+        "количество логичных вопросов, которые могли бы возникнуть "
+        "после прочтения текста.\n"
+        "2. Определи тип сайта (например: лендинг, блог, маркетплейс, "
+        "корпоративный сайт, новостной портал, форум, социальная сеть "
+        "и т.д.) и кратко объясни, почему именно этот тип.\n"
+        "3. Как UX-эксперт, перечисли до 5 достоинств и до 5 слабых "
+        "мест сайта и сформулируй заданное количество конкретных "
+        "и практичных рекомендаций по улучшению UX."
+    )
+
+    # Системные промпты задач: их хэш входит в ключ кэша ответов
+    _TASK_PROMPTS = {
+        "questions": _QUESTIONS_SYSTEM_PROMPT,
+        "classify": _CLASSIFY_SYSTEM_PROMPT,
+        "ux_report": _UX_SYSTEM_PROMPT,
+        "all": _ALL_SYSTEM_PROMPT,
+    }
+
+    def __init__(
+        self,
+        model: str | None = None,
+        max_concurrency: int | None = None,
+        requests_per_minute: int | None = None,
+        creative: bool = False,
+    ) -> None:
         """
         Инициализация клиента OpenAI.
 
         Args:
             model: Название модели OpenAI. Если не указано, читается из .env
                   (OPENAI_MODEL) или используется gpt-4o по умолчанию
+            max_concurrency: Максимум одновременных асинхронных запросов.
+                  Если не указано, читается из .env (OPENAI_MAX_CONCURRENCY)
+                  или используется 8
+            requests_per_minute: Ограничение асинхронных запросов в минуту.
+                  Если не указано, читается из .env (OPENAI_RPM); без него
+                  частота не ограничивается
+            creative: Генерировать более разнообразные вопросы и рекомендации
+                  (temperature 0.7 вместо 0.2)
         """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY не найден в переменных окружения. "
-                "Создайте файл .env и добавьте OPENAI_API_KEY=your_key"
-            )
-        self.client = OpenAI(api_key=api_key)
+        config = _get_config()
+        api_key = config["api_key"]
+        # Повторы выполняет tenacity, поэтому собственные повторы SDK отключены
+        self.client = OpenAI(api_key=api_key, max_retries=0, http_client=_HTTP_CLIENT)
         # Если модель не передана явно, читаем из .env или используем значение по умолчанию
-        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
+        self.model = model or config["model"]
+        # Низкая температура делает ответы короче и стабильнее между запусками
+        self.temperature = 0.7 if creative else 0.2
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
+        # Ограничения для пакетной обработки через asyncio.gather()
+        self._api_key = api_key
+        self._max_concurrency = max_concurrency or config["max_concurrency"]
+        self._requests_per_minute = (
+            requests_per_minute or config["requests_per_minute"]
+        )
+        # Пул соединений aiohttp, семафор и блокировка ограничителя привязаны
+        # к event loop, поэтому создаются лениво для каждого запущенного loop
+        self._async_resources: Dict[asyncio.AbstractEventLoop, _AsyncResources] = (
+            {}
+        )
+
+    def cache_settings(self, task: str) -> Dict[str, Any]:
+        """
+        Возвращает настройки клиента, от которых зависит ответ на задачу.
+
+        Они входят в ключ кэша ответов, поэтому после изменения промпта,
+        формата запросов или температуры старые ответы не используются.
+
+        Args:
+            task: Название задачи (questions, classify, ux_report или all)
+
+        Returns:
+            Словарь с версией формата, хэшем системного промпта
+            и температурой генерации
+        """
+        prompt = self._TASK_PROMPTS[task].encode("utf-8")
+        settings: Dict[str, Any] = {
+            "version": _CACHE_VERSION,
+            "prompt": hashlib.blake2b(prompt, digest_size=8).hexdigest(),
+        }
+        # Классификация всегда выполняется с фиксированной температурой
+        if task != "classify":
+            settings["temperature"] = self.temperature
+        return settings
+
+    def _loop_resources(self) -> _AsyncResources:
+        """Возвращает ресурсы текущего event loop, создавая их при первом обращении."""
+        loop = asyncio.get_running_loop()
+        resources = self._async_resources.get(loop)
+        if resources is None:
+            # Ресурсы завершённых loop использовать уже нельзя
+            closed = [other for other in self._async_resources if other.is_closed()]
+            for other in closed:
+                del self._async_resources[other]
+            resources = self._async_resources[loop] = _AsyncResources(
+                self._api_key, self._max_concurrency, self._requests_per_minute
+            )
+        return resources
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Асинхронный клиент OpenAI текущего event loop."""
+        return self._loop_resources().client
+
+    async def aclose(self) -> None:
+        """
+        Закрывает соединения асинхронного клиента текущего event loop.
+
+        Пул соединений привязан к event loop, поэтому закрывать его нужно внутри
+        того же loop, до его завершения. После закрытия клиентом можно
+        пользоваться дальше: следующий асинхронный запрос откроет новый пул.
+        """
+        resources = self._async_resources.pop(asyncio.get_running_loop(), None)
+        if resources is not None:
+            await resources.client.close()
+
+    @asynccontextmanager
+    async def _async_slot(self) -> AsyncIterator[AsyncOpenAI]:
+        """Занимает слот для асинхронного запроса с учётом лимитов, отдаёт клиент."""
+        resources = self._loop_resources()
+        async with resources.semaphore:
+            if resources.rate_limiter is not None:
+                await resources.rate_limiter.acquire()
+            yield resources.client
+
+    @staticmethod
+    def _complete_lines(parts: List[str], is_complete: Callable[[str], bool]) -> str:
+        """Возвращает завершённые строки ответа, если их уже достаточно, иначе ''."""
+        text = "".join(parts)
+        complete = text[: text.rfind("\n")]
+        return complete if is_complete(complete) else ""
+
+    def _stream_completion(
+        self, request: Dict[str, Any], is_complete: Callable[[str], bool]
+    ) -> str:
+        """
+        Получает ответ модели потоком и прерывает генерацию, когда ответа достаточно.
+
+        Args:
+            request: Параметры запроса chat.completions
+            is_complete: Проверка завершённых строк ответа; если она возвращает
+                True, поток закрывается и оставшиеся токены не генерируются
+
+        Returns:
+            Текст ответа (после досрочной остановки - только завершённые строки)
+        """
+        parts: List[str] = []
+        with self.client.chat.completions.create(
+            model=self.model, stream=True, **request
+        ) as stream:
+            for chunk in stream:
+                piece = chunk.choices[0].delta.content if chunk.choices else None
+                if not piece:
+                    continue
+                parts.append(piece)
+                # Проверяем ответ только когда дописана очередная строка
+                if "\n" in piece:
+                    complete = self._complete_lines(parts, is_complete)
+                    if complete:
+                        return complete
+        return "".join(parts)
+
+    async def _astream_completion(
+        self, request: Dict[str, Any], is_complete: Callable[[str], bool]
+    ) -> str:
+        """Асинхронный вариант _stream_completion()."""
+        parts: List[str] = []
+        async with self._async_slot() as client:
+            stream = await client.chat.completions.create(
+                model=self.model, stream=True, **request
+            )
+            async with stream:
+                async for chunk in stream:
+                    piece = chunk.choices[0].delta.content if chunk.choices else None
+                    if not piece:
+                        continue
+                    parts.append(piece)
+                    if "\n" in piece:
+                        complete = self._complete_lines(parts, is_complete)
+                        if complete:
+                            return complete
+        return "".join(parts)
+
+    @classmethod
+    def _questions_request(
+        cls, text: str, num_questions: int, temperature: float
+    ) -> Dict[str, Any]:
+        """Формирует параметры запроса для генерации вопросов."""
+        return {
+            "messages": [
+                {"role": "system", "content": cls._QUESTIONS_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Текст:\n{text}\n\n"
+                    f"Количество вопросов: {num_questions}",
+                },
+            ],
+            "temperature": temperature,
+            # Короткий вопрос занимает до 40 токенов
+            "max_tokens": 60 + 40 * num_questions,
+        }
+
+    @staticmethod
+    def _clean_questions(result_text: str) -> List[str]:
+        """Извлекает вопросы из ответа модели без ограничения количества."""
+        # Заголовки пропускаем, у остальных строк убираем маркеры списка и нумерацию
+        return [
+            question
+            for question in (
+                _LEAD_MARKERS_RE.sub("", line).strip()
+                for line in result_text.splitlines()
+                if not line.lstrip().startswith("#")
+            )
+            if question
+        ]
+
+    @staticmethod
+    def _parse_questions(result_text: str, num_questions: int) -> List[str]:
+        """Разбирает ответ модели со списком вопросов."""
+        cleaned_questions = OpenAIClient._clean_questions(result_text)
+
+        # Если получили меньше вопросов, чем нужно, возвращаем что есть
+        # Если больше - берем первые num_questions
+        return cleaned_questions[:num_questions] or [_FALLBACK_QUESTIONS]
+
+    @_openai_call("генерации вопросов")
     def generate_questions(self, text: str, num_questions: int = 5) -> List[str]:
         """
         Генерирует вопросы на основе переданного текста.
@@ -54,61 +712,83 @@ class OpenAIClient:
             Список сгенерированных вопросов
 
         Raises:
-            Exception: При ошибках API OpenAI
+            openai.APIError: При временной ошибке API, не устранённой повторами
+            OpenAIClientError: При остальных ошибках API OpenAI
         """
-        prompt = (
-            f"Ты пользователь. Какие вопросы у тебя возникли после прочтения "
-            f"следующего текста? Сформулируй {num_questions} логичных вопросов, "
-            f"которые могли бы задать пользователи.\n\n"
-            f"Текст:\n{text}\n\n"
-            f"Верни только список вопросов, каждый вопрос с новой строки, "
-            f"без нумерации и дополнительных пояснений."
+        text = _truncate_text(text, self.model, *_QUESTIONS_TOKENS)
+        # Генерация останавливается, как только получено нужное число вопросов
+        result_text = self._stream_completion(
+            self._questions_request(text, num_questions, self.temperature),
+            lambda answer: len(self._clean_questions(answer)) >= num_questions,
         )
+        return self._parse_questions(result_text, num_questions)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Ты помощник, который анализирует контент "
-                        "и формулирует вопросы от лица пользователя.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=500,
-            )
+    @_openai_call("генерации вопросов")
+    async def agenerate_questions(self, text: str, num_questions: int = 5) -> List[str]:
+        """Асинхронный вариант generate_questions()."""
+        text = _truncate_text(text, self.model, *_QUESTIONS_TOKENS)
+        result_text = await self._astream_completion(
+            self._questions_request(text, num_questions, self.temperature),
+            lambda answer: len(self._clean_questions(answer)) >= num_questions,
+        )
+        return self._parse_questions(result_text, num_questions)
 
-            questions_text = response.choices[0].message.content.strip()
-            questions = [
-                q.strip()
-                for q in questions_text.split("\n")
-                if q.strip() and not q.strip().startswith(("#", "-", "*", "1.", "2."))
-            ]
+    @classmethod
+    def _classify_request(cls, text: str) -> Dict[str, Any]:
+        """Формирует параметры запроса для классификации контента."""
+        return {
+            "messages": [
+                {"role": "system", "content": cls._CLASSIFY_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Текст:\n{text}"},
+            ],
+            "temperature": 0.3,
+            # Ответ из двух строк: тип и краткое объяснение
+            "max_tokens": 120,
+        }
 
-            # Если вопросы начинаются с маркеров, убираем их
-            cleaned_questions = []
-            for q in questions:
-                # Убираем различные маркеры списка
-                q = q.lstrip("- *•1234567890. ")
-                if q:
-                    cleaned_questions.append(q)
-
-            # Если получили меньше вопросов, чем нужно, возвращаем что есть
-            # Если больше - берем первые num_questions
-            return cleaned_questions[:num_questions] if cleaned_questions else [
-                "Не удалось сгенерировать вопросы"
-            ]
+    @staticmethod
+    def _parse_classification(result_text: str) -> Dict[str, str]:
+        """Разбирает ответ модели с типом сайта и объяснением."""
+        result_text = result_text.strip()
 
-        except Exception as e:
-            raise Exception(f"Ошибка при генерации вопросов через OpenAI: {str(e)}")
+        # Парсим ответ
+        content_type = ""
+        explanation = ""
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
+        lines = result_text.split("\n")
+        for line in lines:
+            line = line.strip()
+            if line.startswith("Тип:") or line.startswith("Тип :"):
+                content_type = line.split(":", 1)[1].strip()
+            elif line.startswith("Объяснение:") or line.startswith("Объяснение :"):
+                explanation = line.split(":", 1)[1].strip()
+
+        # Если не удалось распарсить, пытаемся извлечь из текста
+        if not content_type or not explanation:
+            # Пробуем найти тип в первой строке
+            if not content_type:
+                first_line = lines[0] if lines else ""
+                if ":" in first_line:
+                    content_type = first_line.split(":", 1)[1].strip()
+                else:
+                    content_type = first_line.strip()
+
+            # Остальное - объяснение
+            if not explanation and len(lines) > 1:
+                explanation = " ".join(lines[1:]).strip()
+
+        # Если все еще не нашли, используем весь текст как тип
+        if not content_type:
+            content_type = result_text[:100] if result_text else _FALLBACK_TYPE
+        if not explanation:
+            explanation = _FALLBACK_EXPLANATION
+
+        return {
+            "type": content_type,
+            "explanation": explanation,
+        }
+
+    @_openai_call("классификации контента")
     def classify_content(self, text: str) -> Dict[str, str]:
         """
         Классифицирует тип сайта на основе переданного текста.
@@ -120,81 +800,101 @@ class OpenAIClient:
             Словарь с ключами 'type' (тип сайта) и 'explanation' (краткое объяснение)
 
         Raises:
-            Exception: При ошибках API OpenAI
+            openai.APIError: При временной ошибке API, не устранённой повторами
+            OpenAIClientError: При остальных ошибках API OpenAI
         """
-        prompt = (
-            f"Классифицируй сайт на основе следующего текста. "
-            f"Определи тип сайта (например: лендинг, блог, маркетплейс, "
-            f"корпоративный сайт, новостной портал, форум, социальная сеть и т.д.).\n\n"
-            f"Текст:\n{text}\n\n"
-            f"Верни ответ в формате:\n"
-            f"Тип: [тип сайта]\n"
-            f"Объяснение: [краткое объяснение, почему именно этот тип]"
+        text = _truncate_text(text, self.model, *_CLASSIFY_TOKENS)
+        response = self.client.chat.completions.create(
+            model=self.model, **self._classify_request(text)
         )
+        return self._parse_classification(response.choices[0].message.content)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Ты эксперт по классификации веб-сайтов. "
-                        "Анализируй контент и определяй тип сайта на основе "
-                        "структуры, содержания и назначения.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
-                max_tokens=300,
+    @_openai_call("классификации контента")
+    async def aclassify_content(self, text: str) -> Dict[str, str]:
+        """Асинхронный вариант classify_content()."""
+        text = _truncate_text(text, self.model, *_CLASSIFY_TOKENS)
+        async with self._async_slot() as client:
+            response = await client.chat.completions.create(
+                model=self.model, **self._classify_request(text)
             )
+        return self._parse_classification(response.choices[0].message.content)
 
-            result_text = response.choices[0].message.content.strip()
-
-            # Парсим ответ
-            content_type = ""
-            explanation = ""
-
-            lines = result_text.split("\n")
-            for line in lines:
-                line = line.strip()
-                if line.startswith("Тип:") or line.startswith("Тип :"):
-                    content_type = line.split(":", 1)[1].strip()
-                elif line.startswith("Объяснение:") or line.startswith("Объяснение :"):
-                    explanation = line.split(":", 1)[1].strip()
-
-            # Если не удалось распарсить, пытаемся извлечь из текста
-            if not content_type or not explanation:
-                # Пробуем найти тип в первой строке
-                if not content_type:
-                    first_line = lines[0] if lines else ""
-                    if ":" in first_line:
-                        content_type = first_line.split(":", 1)[1].strip()
-                    else:
-                        content_type = first_line.strip()
-
-                # Остальное - объяснение
-                if not explanation and len(lines) > 1:
-                    explanation = " ".join(lines[1:]).strip()
-
-            # Если все еще не нашли, используем весь текст как тип
-            if not content_type:
-                content_type = result_text[:100] if result_text else "Неизвестный тип"
-            if not explanation:
-                explanation = "Не удалось определить объяснение"
+    @classmethod
+    def _ux_report_request(
+        cls, text: str, num_recommendations: int, temperature: float
+    ) -> Dict[str, Any]:
+        """Формирует параметры запроса для генерации UX-отчёта."""
+        return {
+            "messages": [
+                {"role": "system", "content": cls._UX_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Текст:\n{text}\n\n"
+                    f"Количество рекомендаций: {num_recommendations}",
+                },
+            ],
+            "temperature": temperature,
+            # Достоинства и слабые места плюс до 80 токенов на рекомендацию
+            "max_tokens": 120 + 80 * num_recommendations,
+        }
 
-            return {
-                "type": content_type,
-                "explanation": explanation,
-            }
+    @staticmethod
+    def _parse_bullets(block: str) -> List[str]:
+        """Извлекает пункты списка из текста одной секции."""
+        return [match[1].strip() for match in _UX_ITEM_RE.finditer(block)]
 
-        except Exception as e:
-            raise Exception(f"Ошибка при классификации контента через OpenAI: {str(e)}")
+    @staticmethod
+    def _ux_sections(result_text: str) -> Dict[str, List[str]]:
+        """Раскладывает пункты UX-отчёта по секциям без ограничения количества."""
+        sections: Dict[str, List[str]] = {
+            "strengths": [],
+            "weaknesses": [],
+            "recommendations": [],
+        }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
+        # Находим смещения заголовков и разбираем текст между ними как пункты
+        # секции, не проверяя каждую строку на заголовок
+        headers = list(_UX_HEADER_RE.finditer(result_text))
+        ends = [header.start() for header in headers[1:]] + [len(result_text)]
+        for header, end in zip(headers, ends):
+            sections[_UX_SECTIONS[header[1][:4].lower()]] += (
+                OpenAIClient._parse_bullets(result_text[header.end() : end])
+            )
+        return sections
+
+    @staticmethod
+    def _parse_ux_report(
+        result_text: str, num_recommendations: int
+    ) -> Dict[str, List[str]]:
+        """Разбирает ответ модели с UX-отчётом."""
+        sections = OpenAIClient._ux_sections(result_text)
+        strengths = sections["strengths"]
+        weaknesses = sections["weaknesses"]
+        recommendations = sections["recommendations"]
+
+        # Если не удалось распарсить структурированно, пытаемся извлечь из текста
+        if not strengths and not weaknesses and not recommendations:
+            # Пробуем найти рекомендации по номерам, отбрасывая слишком короткие
+            recommendations = [
+                item
+                for item in map(str.strip, _NUMBERED_ITEM_RE.findall(result_text))
+                if len(item) > 10
+            ]
+
+        # Ограничиваем количество рекомендаций
+        recommendations = recommendations[:num_recommendations]
+
+        # Если ничего не нашли, возвращаем сообщение об ошибке
+        if not recommendations:
+            recommendations = [_FALLBACK_RECOMMENDATIONS]
+
+        return {
+            "strengths": strengths[:5] if strengths else ["Не указаны"],
+            "weaknesses": weaknesses[:5] if weaknesses else ["Не указаны"],
+            "recommendations": recommendations,
+        }
+
+    @_openai_call("генерации UX-отчёта")
     def generate_ux_report(self, text: str, num_recommendations: int = 5) -> Dict[str, List[str]]:
         """
         Генерирует UX-отчёт с рекомендациями по улучшению на основе текста сайта.
@@ -210,125 +910,167 @@ class OpenAIClient:
             - 'recommendations' (рекомендации по улучшению)
 
         Raises:
-            Exception: При ошибках API OpenAI
+            openai.APIError: При временной ошибке API, не устранённой повторами
+            OpenAIClientError: При остальных ошибках API OpenAI
         """
-        prompt = (
-            f"Ты UX-эксперт. Проанализируй следующий текст сайта и создай UX-отчёт.\n\n"
-            f"Текст:\n{text}\n\n"
-            f"Верни отчёт в следующем формате:\n"
-            f"Достоинства:\n"
-            f"- [достоинство 1]\n"
-            f"- [достоинство 2]\n"
-            f"- [достоинство 3]\n\n"
-            f"Слабые места:\n"
-            f"- [слабое место 1]\n"
-            f"- [слабое место 2]\n"
-            f"- [слабое место 3]\n\n"
-            f"Рекомендации по улучшению UX:\n"
-            f"1. [рекомендация 1]\n"
-            f"2. [рекомендация 2]\n"
-            f"3. [рекомендация 3]\n"
-            f"4. [рекомендация 4]\n"
-            f"5. [рекомендация 5]\n\n"
-            f"Сформулируй {num_recommendations} конкретных и практичных рекомендаций."
+        text = _truncate_text(text, self.model, *_UX_TOKENS)
+        # Рекомендации - последняя секция отчёта, поэтому генерацию можно
+        # остановить, как только их набралось достаточно
+        result_text = self._stream_completion(
+            self._ux_report_request(text, num_recommendations, self.temperature),
+            lambda answer: len(self._ux_sections(answer)["recommendations"])
+            >= num_recommendations,
         )
+        return self._parse_ux_report(result_text, num_recommendations)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Ты опытный UX-эксперт с глубоким пониманием "
-                        "пользовательского опыта, юзабилити и дизайна интерфейсов. "
-                        "Ты анализируешь сайты и даёшь конструктивные рекомендации "
-                        "по улучшению пользовательского опыта.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=1500,
+    @_openai_call("генерации UX-отчёта")
+    async def agenerate_ux_report(
+        self, text: str, num_recommendations: int = 5
+    ) -> Dict[str, List[str]]:
+        """Асинхронный вариант generate_ux_report()."""
+        text = _truncate_text(text, self.model, *_UX_TOKENS)
+        result_text = await self._astream_completion(
+            self._ux_report_request(text, num_recommendations, self.temperature),
+            lambda answer: len(self._ux_sections(answer)["recommendations"])
+            >= num_recommendations,
+        )
+        return self._parse_ux_report(result_text, num_recommendations)
+
+    @classmethod
+    def _all_request(
+        cls, text: str, num_questions: int, num_recommendations: int, temperature: float
+    ) -> Dict[str, Any]:
+        """Формирует параметры запроса, объединяющего все задачи в один вызов."""
+        return {
+            "messages": [
+                {"role": "system", "content": cls._ALL_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Текст:\n{text}\n\n"
+                    f"Количество вопросов: {num_questions}\n"
+                    f"Количество рекомендаций: {num_recommendations}",
+                },
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": _ALL_TASKS_SCHEMA,
+            },
+            "temperature": temperature,
+            # Запас на разметку JSON, классификацию и до 10 достоинств и слабых мест:
+            # обрезанный ответ не пройдёт разбор
+            "max_tokens": 700 + 40 * num_questions + 80 * num_recommendations,
+        }
+
+    @staticmethod
+    def _parse_all(message: Any, num_questions: int, num_recommendations: int) -> Dict:
+        """Разбирает JSON-ответ модели со всеми задачами."""
+        # При отказе модели Structured Outputs возвращают refusal вместо content
+        if getattr(message, "refusal", None):
+            raise OpenAIClientError(
+                f"Модель отказалась выполнить анализ страницы: {message.refusal}"
             )
+        if not message.content:
+            raise OpenAIClientError("Модель вернула пустой ответ на анализ страницы")
 
-            result_text = response.choices[0].message.content.strip()
+        data = orjson.loads(message.content)
+        content_type = data["content_type"]
+        ux_report = {
+            key: [item.strip() for item in items if item.strip()]
+            for key, items in data["ux_report"].items()
+        }
 
-            # Парсим ответ
-            strengths = []
-            weaknesses = []
-            recommendations = []
+        questions = [q.strip() for q in data["questions"] if q.strip()]
+        return {
+            "questions": questions[:num_questions]
+            or [_FALLBACK_QUESTIONS],
+            "content_type": {
+                "type": content_type["type"].strip() or _FALLBACK_TYPE,
+                "explanation": content_type["explanation"].strip()
+                or _FALLBACK_EXPLANATION,
+            },
+            "ux_report": {
+                "strengths": ux_report["strengths"][:5] or ["Не указаны"],
+                "weaknesses": ux_report["weaknesses"][:5] or ["Не указаны"],
+                "recommendations": ux_report["recommendations"][:num_recommendations]
+                or [_FALLBACK_RECOMMENDATIONS],
+            },
+        }
 
-            current_section = None
-            lines = result_text.split("\n")
+    @_openai_call("анализе страницы")
+    def generate_all(
+        self, text: str, num_questions: int = 5, num_recommendations: int = 5
+    ) -> Dict:
+        """
+        Выполняет все задачи одним запросом: вопросы, классификацию и UX-отчёт.
 
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+        Текст страницы отправляется в модель один раз, а ответ возвращается
+        в виде JSON по схеме (Structured Outputs), поэтому модель должна
+        поддерживать response_format типа json_schema (например, gpt-4o).
 
-                # Определяем текущую секцию
-                if "достоинства" in line.lower() or "достоинство" in line.lower():
-                    current_section = "strengths"
-                    continue
-                elif "слабые места" in line.lower() or "слабое место" in line.lower():
-                    current_section = "weaknesses"
-                    continue
-                elif "рекомендации" in line.lower() or "рекомендация" in line.lower():
-                    current_section = "recommendations"
-                    continue
+        Args:
+            text: Текст для анализа
+            num_questions: Количество вопросов для генерации
+            num_recommendations: Количество рекомендаций по улучшению UX
 
-                # Добавляем элементы в соответствующие списки
-                if current_section == "strengths":
-                    if line.startswith("-") or line.startswith("•") or line.startswith("*"):
-                        item = line.lstrip("- •*").strip()
-                        if item:
-                            strengths.append(item)
-                    elif line and not line.startswith("Достоинства"):
-                        strengths.append(line)
-
-                elif current_section == "weaknesses":
-                    if line.startswith("-") or line.startswith("•") or line.startswith("*"):
-                        item = line.lstrip("- •*").strip()
-                        if item:
-                            weaknesses.append(item)
-                    elif line and not line.startswith("Слабые"):
-                        weaknesses.append(line)
-
-                elif current_section == "recommendations":
-                    # Рекомендации могут быть пронумерованы
-                    if any(line.startswith(f"{i}.") for i in range(1, 10)):
-                        item = line.split(".", 1)[1].strip() if "." in line else line
-                        if item:
-                            recommendations.append(item)
-                    elif line.startswith("-") or line.startswith("•") or line.startswith("*"):
-                        item = line.lstrip("- •*").strip()
-                        if item:
-                            recommendations.append(item)
-                    elif line and not line.startswith("Рекомендации"):
-                        recommendations.append(line)
-
-            # Если не удалось распарсить структурированно, пытаемся извлечь из текста
-            if not strengths and not weaknesses and not recommendations:
-                # Пробуем найти рекомендации по номерам
-                for line in lines:
-                    line = line.strip()
-                    if any(line.startswith(f"{i}.") for i in range(1, 10)):
-                        item = line.split(".", 1)[1].strip() if "." in line else line
-                        if item and len(item) > 10:  # Фильтруем слишком короткие
-                            recommendations.append(item)
-
-            # Ограничиваем количество рекомендаций
-            recommendations = recommendations[:num_recommendations]
-
-            # Если ничего не нашли, возвращаем сообщение об ошибке
-            if not recommendations:
-                recommendations = ["Не удалось сгенерировать рекомендации"]
-
-            return {
-                "strengths": strengths[:5] if strengths else ["Не указаны"],
-                "weaknesses": weaknesses[:5] if weaknesses else ["Не указаны"],
-                "recommendations": recommendations,
+        Returns:
+            Словарь с результатами всех задач:
+            {
+                'questions': List[str],
+                'content_type': Dict[str, str],
+                'ux_report': Dict[str, List[str]]
             }
 
-        except Exception as e:
-            raise Exception(f"Ошибка при генерации UX-отчёта через OpenAI: {str(e)}")
+        Raises:
+            openai.APIError: При временной ошибке API, не устранённой повторами
+            OpenAIClientError: При остальных ошибках API OpenAI
+        """
+        text = _truncate_text(text, self.model, *_ALL_TOKENS)
+        response = self.client.chat.completions.create(
+            model=self.model,
+            **self._all_request(
+                text, num_questions, num_recommendations, self.temperature
+            ),
+        )
+        return self._parse_all(
+            response.choices[0].message, num_questions, num_recommendations
+        )
+
+    @_openai_call("анализе страницы")
+    async def agenerate_all(
+        self, text: str, num_questions: int = 5, num_recommendations: int = 5
+    ) -> Dict:
+        """Асинхронный вариант generate_all()."""
+        text = _truncate_text(text, self.model, *_ALL_TOKENS)
+        async with self._async_slot() as client:
+            response = await client.chat.completions.create(
+                model=self.model,
+                **self._all_request(
+                    text, num_questions, num_recommendations, self.temperature
+                ),
+            )
+        return self._parse_all(
+            response.choices[0].message, num_questions, num_recommendations
+        )
+
+
+@lru_cache(maxsize=1)
+def get_default_client() -> OpenAIClient:
+    """
+    Возвращает общий клиент OpenAI с моделью из настроек.
+
+    Клиент создаётся один раз за процесс, поэтому агенты без явно заданной
+    модели используют общие соединения и общие лимиты запросов.
+
+    Returns:
+        Экземпляр OpenAIClient
+    """
+    return OpenAIClient()
+
+
+def close_clients() -> None:
+    """Закрывает общий пул соединений синхронных клиентов OpenAI."""
+    _HTTP_CLIENT.close()
+
 
+# Соединения общего пула закрываются при завершении процесса
+atexit.register(close_clients)